@@ -0,0 +1,652 @@
+import concurrent.futures
+import hashlib
+import json
+import logging
+import math
+import operator
+import os
+import re
+import time
+
+from collections import OrderedDict
+from types import MappingProxyType
+
+import fastjsonschema
+import requests
+from tenacity import (
+    retry,
+    retry_if_exception_type,
+    stop_after_attempt,
+    wait_exponential,
+)
+from videodb.exceptions import VideodbError
+
+from director.agents.base import BaseAgent, AgentResponse, AgentStatus
+from director.llm import get_default_llm
+from director.core.session import (
+    Session,
+    MsgStatus,
+    TextContent,
+    SearchResultsContent,
+    SearchData,
+    ShotData,
+    VideoContent,
+    VideoData,
+    ContextMessage,
+    RoleTypes,
+)
+from director.tools.videodb_tool import VideoDBTool
+
+logger = logging.getLogger(__name__)
+
+SURVEILLANCE_AGENT_PARAMETERS = {
+    "type": "object",
+    "properties": {
+        "query": {
+            "type": "string",
+            "description": "Query describing the event or activity to find in the footage, ex: delivery person arriving at the door",
+        },
+        "video_id": {
+            "type": "string",
+            "description": "The ID of the surveillance video to process.",
+        },
+        "collection_id": {
+            "type": "string",
+            "description": "The ID of the collection to process.",
+        },
+        "result_threshold": {
+            "type": "number",
+            "description": "Initial filter for top N matching scenes (default: 8).",
+        },
+        "score_threshold": {
+            "type": "number",
+            "description": "Absolute threshold filter for relevance scores (default: 0.2).",
+        },
+        "dynamic_score_percentage": {
+            "type": "integer",
+            "description": "Adaptive filtering mechanism: Retains top x% of the score range. Calculation: dynamic_threshold = max_score - (range * dynamic_score_percentage) (default: 20 percent)",
+        },
+    },
+    "required": ["query", "video_id", "collection_id"],
+}
+
+# Compiled once at import so each run() pays a plain function call instead of
+# pure-Python schema reflection.
+_VALIDATE_PARAMS = fastjsonschema.compile(SURVEILLANCE_AGENT_PARAMETERS)
+
+SCENE_INDEX_PROMPT = """
+    Describe the attached surveillance frame for indexing and retrieval.
+
+    Cover the following in a single paragraph without any formatting:
+        People: number of individuals, appearance, actions and direction of movement.
+        Vehicles: type, color and any visible identifiers such as license plates or company markings.
+        Objects: packages, bags, tools or anything being carried, placed or removed.
+        Environment: indoor/outdoor, entry points, lighting conditions and camera viewpoint.
+        Activity: what is happening, including arrivals, departures, deliveries, loitering or unusual behavior.
+        Timestamps: any visible time and date stamps or camera labels.
+
+    Be objective and specific; if something is unclear mention it with the most likely interpretation.
+    """.strip()
+
+DEFAULT_SCENE_INDEX_CONFIG = MappingProxyType(
+    {
+        "threshold": 20,
+        "min_scene_len": 15,
+        "frame_count": 4,
+    }
+)
+
+
+class SemanticCache:
+    """In-memory LRU cache with TTL for semantic search results.
+
+    Entries are scoped by (collection_id, video_id, scene_index_id, search
+    thresholds) and matched on cosine similarity of query embeddings, so
+    near-identical queries like "delivery driver arriving" and "delivery
+    person arrives" reuse stored shots and compilation streams instead of
+    re-running search and compile.
+    """
+
+    def __init__(self, max_size=128, ttl=300):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+
+    @staticmethod
+    def _cosine_similarity(a, b):
+        dot = sum(x * y for x, y in zip(a, b))
+        norm_a = math.sqrt(sum(x * x for x in a))
+        norm_b = math.sqrt(sum(x * x for x in b))
+        if not norm_a or not norm_b:
+            return 0.0
+        return dot / (norm_a * norm_b)
+
+    def _drop_expired(self):
+        now = time.time()
+        for key in list(self._entries.keys()):
+            if self._entries[key]["expires_at"] <= now:
+                del self._entries[key]
+
+    def get(self, scope_key, query, query_embedding=None, similarity_threshold=0.92):
+        self._drop_expired()
+        for key, entry in self._entries.items():
+            if key[0] != scope_key:
+                continue
+            if key[1] == query:
+                self._entries.move_to_end(key)
+                return entry["payload"]
+            if query_embedding and entry["embedding"]:
+                similarity = self._cosine_similarity(
+                    query_embedding, entry["embedding"]
+                )
+                if similarity >= similarity_threshold:
+                    self._entries.move_to_end(key)
+                    return entry["payload"]
+        return None
+
+    def put(self, scope_key, query, query_embedding, payload, ttl=None):
+        key = (scope_key, query)
+        self._entries[key] = {
+            "embedding": query_embedding,
+            "payload": payload,
+            "expires_at": time.time() + (ttl if ttl is not None else self.ttl),
+        }
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, video_id):
+        """Drop cached results of a video, used when it gets a new scene index."""
+        for key in list(self._entries.keys()):
+            if key[0][1] == video_id:
+                del self._entries[key]
+
+
+_semantic_cache = SemanticCache()
+
+_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]+$")
+
+# Queries that cannot describe an event in the footage, rejected up front so
+# they never cost an indexing or search round trip.
+_TRIVIAL_QUERIES = {"test", "hi", "hello", "?"}
+
+
+# Video metadata keyed by (collection_id, video_id). Only the fields the
+# agent reads are stored, so large or dynamic fields are never served stale.
+_VIDEO_META_TTL = 300
+_video_meta_cache: dict = {}
+
+
+def _get_video_cached(videodb_tool, collection_id, video_id):
+    """Fetch the name, stream url and length of a video with a TTL cache."""
+    key = (collection_id, video_id)
+    entry = _video_meta_cache.get(key)
+    if entry and entry["expires_at"] > time.time():
+        return entry["video"]
+    video = videodb_tool.get_video(video_id=video_id)
+    video = {
+        "name": video.get("name"),
+        "stream_url": video.get("stream_url"),
+        "length": video.get("length"),
+    }
+    _video_meta_cache[key] = {
+        "video": video,
+        "expires_at": time.time() + _VIDEO_META_TTL,
+    }
+    return video
+
+
+# Scene index ids keyed by (video_id, prompt_hash, config_hash), so repeat
+# queries on an already indexed video skip the remote lookup entirely. The
+# mapping is persisted to disk so process restarts also start warm; entries
+# expire after a week to tolerate server-side re-indexing.
+_SCENE_INDEX_CACHE_PATH = os.path.expanduser("~/.director/scene_index_cache.json")
+_SCENE_INDEX_CACHE_TTL = 7 * 24 * 3600
+
+
+def _scene_index_cache_key(video_id, prompt, config):
+    prompt_hash = hashlib.sha1(prompt.encode()).hexdigest()[:16]
+    config_hash = hashlib.sha1(
+        json.dumps(dict(config), sort_keys=True).encode()
+    ).hexdigest()[:16]
+    return (video_id, prompt_hash, config_hash)
+
+
+def _load_scene_index_ids():
+    """Load the persisted scene index mapping, dropping expired entries."""
+    try:
+        with open(_SCENE_INDEX_CACHE_PATH) as f:
+            entries = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    now = time.time()
+    return {
+        tuple(key.split(":")): entry
+        for key, entry in entries.items()
+        if entry.get("expires_at", 0) > now
+    }
+
+
+_scene_index_ids = _load_scene_index_ids()
+
+
+def _get_scene_index_id(cache_key):
+    entry = _scene_index_ids.get(cache_key)
+    if entry and entry["expires_at"] > time.time():
+        return entry["scene_index_id"]
+    return None
+
+
+def _store_scene_index_id(cache_key, scene_index_id):
+    _scene_index_ids[cache_key] = {
+        "scene_index_id": scene_index_id,
+        "expires_at": time.time() + _SCENE_INDEX_CACHE_TTL,
+    }
+    try:
+        os.makedirs(os.path.dirname(_SCENE_INDEX_CACHE_PATH), exist_ok=True)
+        with open(_SCENE_INDEX_CACHE_PATH, "w") as f:
+            json.dump(
+                {
+                    ":".join(key): entry
+                    for key, entry in _scene_index_ids.items()
+                },
+                f,
+            )
+    except OSError as e:
+        logger.warning(f"Failed to persist scene index cache: {e}")
+
+
+# Compilation stream urls keyed by shot signature, compile() stitches the
+# video server-side and often dominates wall time, identical shot sets always
+# produce the same stream.
+_compile_cache: dict = {}
+
+
+def _shot_signature(video_id, shot_data_list):
+    """Deterministic key of a shot set, used to memoize compile() results."""
+    signature = ";".join(
+        f"{shot.start:.3f}-{shot.end:.3f}" for shot in shot_data_list
+    )
+    return hashlib.sha1(f"{video_id}|{signature}".encode()).hexdigest()
+
+
+def _build_shot_data(shots):
+    """Build ShotData objects and their texts in one pass over the raw shot dicts."""
+    fields = operator.itemgetter("search_score", "start", "end", "text")
+    shot_data_list = []
+    texts = []
+    for search_score, start, end, text in map(fields, shots):
+        shot_data_list.append(
+            ShotData(search_score=search_score, start=start, end=end, text=text)
+        )
+        texts.append(text)
+    return shot_data_list, texts
+
+
+class SurveillanceAgent(BaseAgent):
+    def __init__(self, session: Session, **kwargs):
+        self.agent_name = "surveillance"
+        self.description = "Agent to analyze surveillance footage. It indexes the scenes of the video, finds the moments matching the query and returns a compilation clip with a summary of the matching scenes."
+        self.llm = get_default_llm()
+        self.parameters = SURVEILLANCE_AGENT_PARAMETERS
+        super().__init__(session=session, **kwargs)
+
+    def _get_query_embedding(self, query):
+        """Embed the query for semantic cache lookups.
+
+        Returns None when no OpenAI key is configured, in that case the cache
+        falls back to exact matches on the normalized query.
+        """
+        if not os.getenv("OPENAI_API_KEY"):
+            return None
+        try:
+            import openai
+
+            client = openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+            response = client.embeddings.create(
+                model="text-embedding-3-small", input=query
+            )
+            return response.data[0].embedding
+        except Exception as e:
+            logger.warning(f"Failed to embed query for semantic cache: {e}")
+            return None
+
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=wait_exponential(multiplier=1, max=8),
+        retry=retry_if_exception_type(requests.HTTPError),
+        reraise=True,
+    )
+    def _index_scene_with_retry(self, videodb_tool, video_id, extraction_config):
+        """Index the scenes of the video, retrying transient HTTP failures."""
+        return videodb_tool.index_scene(
+            video_id=video_id,
+            # The client serializes the config to JSON, which rejects the
+            # frozen default mapping, so hand over a plain dict.
+            extraction_config=dict(extraction_config),
+            prompt=SCENE_INDEX_PROMPT,
+        )
+
+    def _ensure_scene_index(self, videodb_tool, video_id, extraction_config):
+        """Get the scene index id of the video, indexing it when needed.
+
+        Checks the local mapping first, then any existing index on the video,
+        and only indexes when neither is available.
+        """
+        cache_key = _scene_index_cache_key(
+            video_id, SCENE_INDEX_PROMPT, extraction_config
+        )
+        scene_index_id = _get_scene_index_id(cache_key)
+        if scene_index_id:
+            return scene_index_id
+        scene_index_list = videodb_tool.list_scene_index(video_id)
+        if scene_index_list:
+            scene_index_id = scene_index_list[0].get("scene_index_id")
+        else:
+            try:
+                scene_index_id = self._index_scene_with_retry(
+                    videodb_tool, video_id, extraction_config
+                )
+                videodb_tool.get_scene_index(
+                    video_id=video_id, scene_id=scene_index_id
+                )
+                _semantic_cache.invalidate(video_id)
+            except (requests.HTTPError, VideodbError) as e:
+                logger.warning(
+                    f"Scene indexing failed, falling back to existing index: {e}"
+                )
+                scene_index_list = videodb_tool.list_scene_index(video_id)
+                if not scene_index_list:
+                    raise Exception(
+                        "Scene index not found, please index the scene first."
+                    )
+                scene_index_id = scene_index_list[0].get("scene_index_id")
+        _store_scene_index_id(cache_key, scene_index_id)
+        return scene_index_id
+
+    @staticmethod
+    def _fail_pending_contents(
+        search_result_content, video_content, search_summary_content
+    ):
+        """Mark every content that did not finish as errored."""
+        for content, status_message in (
+            (search_result_content, "Failed to get search results."),
+            (video_content, "Failed to create compilation of search results."),
+            (search_summary_content, "Failed to generate summary of results."),
+        ):
+            if content.status != MsgStatus.success:
+                content.status = MsgStatus.error
+                content.status_message = status_message
+
+    def _get_compilation_stream_url(
+        self,
+        videodb_tool,
+        video_id,
+        search_results,
+        shot_data_list,
+        shots_filtered,
+        cache_compilations,
+    ):
+        """Compile the matching shots into a stream, memoized by shot signature."""
+        compile_key = _shot_signature(video_id, shot_data_list)
+        if cache_compilations and compile_key in _compile_cache:
+            return _compile_cache[compile_key]
+        if shots_filtered:
+            timeline = [(shot.start, shot.end) for shot in shot_data_list]
+            compilation_stream_url = videodb_tool.generate_video_stream(
+                video_id=video_id, timeline=timeline
+            )
+        else:
+            compilation_stream_url = search_results.compile()
+        if cache_compilations:
+            _compile_cache[compile_key] = compilation_stream_url
+        return compilation_stream_url
+
+    def run(
+        self,
+        query: str,
+        video_id: str,
+        collection_id: str,
+        result_threshold=8,
+        score_threshold=0.2,
+        dynamic_score_percentage=20,
+        index_threshold=DEFAULT_SCENE_INDEX_CONFIG["threshold"],
+        index_min_scene_len=DEFAULT_SCENE_INDEX_CONFIG["min_scene_len"],
+        index_frame_count=DEFAULT_SCENE_INDEX_CONFIG["frame_count"],
+        cache_similarity_threshold=0.92,
+        cache_ttl=300,
+        cache_compilations=True,
+        *args,
+        **kwargs,
+    ) -> AgentResponse:
+        """
+        Find the moments matching the query in the surveillance footage.
+
+        :return: The response containing matching scenes, text summary and compilation video.
+        :rtype: AgentResponse
+        """
+        logger.debug("query=%s video_id=%s collection_id=%s", query, video_id, collection_id)
+        try:
+            _VALIDATE_PARAMS(
+                {
+                    "query": query,
+                    "video_id": video_id,
+                    "collection_id": collection_id,
+                    "result_threshold": result_threshold,
+                    "score_threshold": score_threshold,
+                    "dynamic_score_percentage": dynamic_score_percentage,
+                }
+            )
+        except fastjsonschema.JsonSchemaException as e:
+            return AgentResponse(
+                status=AgentStatus.ERROR,
+                message=f"Invalid parameters: {e}",
+            )
+        query = query.strip() if query else ""
+        if len(query) < 3 or query.lower() in _TRIVIAL_QUERIES:
+            return AgentResponse(
+                status=AgentStatus.ERROR,
+                message="Query is too short, please describe the event to find in the footage.",
+            )
+        for param_name, param_value in (
+            ("video_id", video_id),
+            ("collection_id", collection_id),
+        ):
+            if not isinstance(param_value, str) or not _ID_PATTERN.match(
+                param_value
+            ):
+                return AgentResponse(
+                    status=AgentStatus.ERROR,
+                    message=f"Invalid {param_name} {param_value}",
+                )
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=3)
+        try:
+            search_result_content = SearchResultsContent(
+                status=MsgStatus.progress,
+                status_message="Started getting search results.",
+                agent_name=self.agent_name,
+            )
+            self.output_message.content.append(search_result_content)
+            video_content = VideoContent(
+                status=MsgStatus.progress,
+                status_message="Started video compilation.",
+                agent_name=self.agent_name,
+            )
+            self.output_message.content.append(video_content)
+            search_summary_content = TextContent(
+                status=MsgStatus.progress,
+                status_message="Started generating summary of search results.",
+                agent_name=self.agent_name,
+            )
+            self.output_message.content.append(search_summary_content)
+            self.output_message.actions.append("Analyzing surveillance footage..")
+            self.output_message.push_update()
+            videodb_tool = VideoDBTool(collection_id=collection_id)
+            extraction_config = DEFAULT_SCENE_INDEX_CONFIG
+            if (
+                index_threshold,
+                index_min_scene_len,
+                index_frame_count,
+            ) != tuple(DEFAULT_SCENE_INDEX_CONFIG.values()):
+                extraction_config = {
+                    "threshold": index_threshold,
+                    "min_scene_len": index_min_scene_len,
+                    "frame_count": index_frame_count,
+                }
+            video_future = executor.submit(
+                _get_video_cached, videodb_tool, collection_id, video_id
+            )
+            scene_index_future = executor.submit(
+                self._ensure_scene_index,
+                videodb_tool,
+                video_id,
+                extraction_config,
+            )
+            video = video_future.result()
+            scene_index_id = scene_index_future.result()
+
+            scope_key = (
+                collection_id,
+                video_id,
+                scene_index_id,
+                result_threshold,
+                score_threshold,
+                dynamic_score_percentage,
+            )
+            normalized_query = " ".join(query.lower().split())
+            query_embedding = self._get_query_embedding(normalized_query)
+            cached = _semantic_cache.get(
+                scope_key,
+                normalized_query,
+                query_embedding,
+                cache_similarity_threshold,
+            )
+            if cached is not None:
+                self.output_message.actions.append(
+                    "Reusing cached results for a similar query.."
+                )
+                self.output_message.push_update()
+                shot_data_list = cached["shots"]
+                shot_texts = [shot.text for shot in shot_data_list]
+                compilation_stream_url = cached["compilation_stream_url"]
+                search_results = None
+            else:
+                search_results = videodb_tool.semantic_search(
+                    query,
+                    index_type="scene",
+                    video_id=video_id,
+                    result_threshold=result_threshold,
+                    score_threshold=score_threshold,
+                    dynamic_score_percentage=dynamic_score_percentage,
+                    scene_index_id=scene_index_id,
+                )
+                shots = search_results.get_shots()
+                if not shots:
+                    self._fail_pending_contents(
+                        search_result_content, video_content, search_summary_content
+                    )
+                    return AgentResponse(
+                        status=AgentStatus.ERROR,
+                        message=f"Failed due to no search results found for query {query}",
+                        data={
+                            "message": f"Failed due to no search results found for query {query}",
+                        },
+                    )
+                best_score = max(shot["search_score"] for shot in shots)
+                score_cutoff = max(
+                    score_threshold,
+                    best_score * (1 - dynamic_score_percentage / 100),
+                )
+                filtered_shots = [
+                    shot for shot in shots if shot["search_score"] >= score_cutoff
+                ]
+                shots_filtered = len(filtered_shots) < len(shots)
+                shot_data_list, shot_texts = _build_shot_data(filtered_shots)
+                compilation_stream_url = None
+            search_result_content.search_results = [
+                SearchData(
+                    video_id=video_id,
+                    video_title=video.get("name"),
+                    stream_url=video.get("stream_url"),
+                    duration=video.get("length"),
+                    shots=shot_data_list,
+                )
+            ]
+            search_result_content.status = MsgStatus.success
+            search_result_content.status_message = "Search done."
+            self.output_message.actions.append(
+                "Generating compilation clip of matching scenes.."
+            )
+            self.output_message.push_update()
+            compilation_future = None
+            if compilation_stream_url is None:
+                compilation_future = executor.submit(
+                    self._get_compilation_stream_url,
+                    videodb_tool,
+                    video_id,
+                    search_results,
+                    shot_data_list,
+                    shots_filtered,
+                    cache_compilations,
+                )
+            # Build the summary text locally while the compilation runs remotely.
+            self.output_message.actions.append(
+                "Generating summary of matching scenes.."
+            )
+            self.output_message.push_update()
+            search_result_text = "\n\n".join(shot_texts)
+            if compilation_future is not None:
+                compilation_stream_url = compilation_future.result()
+                _semantic_cache.put(
+                    scope_key,
+                    normalized_query,
+                    query_embedding,
+                    {
+                        "shots": shot_data_list,
+                        "compilation_stream_url": compilation_stream_url,
+                    },
+                    ttl=cache_ttl,
+                )
+            video_content.video = VideoData(stream_url=compilation_stream_url)
+            video_content.status = MsgStatus.success
+            video_content.status_message = "Compilation done."
+            self.output_message.push_update()
+            search_summary_llm_prompt = f"Summarize the search results of the surveillance footage for query: {query} search results: {search_result_text}"
+            search_summary_llm_message = ContextMessage(
+                content=search_summary_llm_prompt, role=RoleTypes.user
+            )
+            llm_response = self.llm.chat_completions(
+                [search_summary_llm_message.to_llm_msg()]
+            )
+            if not llm_response.status:
+                search_summary_content.status = MsgStatus.error
+                search_summary_content.status_message = (
+                    "Failed to generate the summary of search results."
+                )
+                logger.error(f"LLM failed with {llm_response}")
+            else:
+                search_summary_content.text = llm_response.content
+                search_summary_content.status = MsgStatus.success
+                search_summary_content.status_message = (
+                    "Here is the summary of search results."
+                )
+            self.output_message.publish()
+        except Exception as e:
+            logger.exception(f"Error in {self.agent_name}.")
+            self._fail_pending_contents(
+                search_result_content, video_content, search_summary_content
+            )
+            return AgentResponse(
+                status=AgentStatus.ERROR,
+                message=f"Failed the surveillance search with exception. {e}",
+            )
+        finally:
+            executor.shutdown(wait=False)
+        return AgentResponse(
+            status=AgentStatus.SUCCESS,
+            message="Surveillance search done and showed above to user.",
+            data={
+                "message": "Surveillance search done.",
+                "stream_link": compilation_stream_url,
+            },
+        )
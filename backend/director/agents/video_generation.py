@@ -12,12 +12,16 @@ from director.tools.stabilityai import (
     PARAMS_CONFIG as STABILITYAI_PARAMS_CONFIG,
 )
 from director.tools.kling import KlingAITool, PARAMS_CONFIG as KLING_PARAMS_CONFIG
+from director.tools.fal_video import (
+    FalVideoGenerationTool,
+    PARAMS_CONFIG as FAL_PARAMS_CONFIG,
+)
 
 from director.constants import DOWNLOADS_PATH
 
 logger = logging.getLogger(__name__)
 
-SUPPORTED_ENGINES = ["stabilityai", "kling"]
+SUPPORTED_ENGINES = ["stabilityai", "kling", "fal"]
 
 VIDEO_GENERATION_AGENT_PARAMETERS = {
     "type": "object",
@@ -30,7 +34,7 @@ VIDEO_GENERATION_AGENT_PARAMETERS = {
             "type": "string",
             "description": "The video generation engine to use",
             "default": "stabilityai",
-            "enum": ["stabilityai", "kling"],
+            "enum": ["stabilityai", "kling", "fal"],
         },
         "job_type": {
             "type": "string",
@@ -63,6 +67,11 @@ VIDEO_GENERATION_AGENT_PARAMETERS = {
                     "properties": KLING_PARAMS_CONFIG["text_to_video"],
                     "description": "Config to use when kling engine is used",
                 },
+                "fal_config": {
+                    "type": "object",
+                    "properties": FAL_PARAMS_CONFIG["text_to_video"],
+                    "description": "Config to use when fal engine is used",
+                },
             },
             "required": ["prompt"],
         },
@@ -119,6 +128,12 @@ class VideoGenerationAgent(BaseAgent):
                     secret_key=KLING_AI_SECRET_API_KEY,
                 )
                 config_key = "kling_config"
+            elif engine == "fal":
+                FAL_KEY = os.getenv("FAL_KEY")
+                if not FAL_KEY:
+                    raise Exception("FAL API key not found")
+                video_gen_tool = FalVideoGenerationTool(api_key=FAL_KEY)
+                config_key = "fal_config"
             else:
                 raise Exception(f"{engine} not supported")
 
@@ -7,6 +7,7 @@ from director.agents.download import DownloadAgent
 from director.agents.pricing import PricingAgent
 from director.agents.upload import UploadAgent
 from director.agents.search import SearchAgent
+from director.agents.surveillance import SurveillanceAgent
 from director.agents.prompt_clip import PromptClipAgent
 from director.agents.index import IndexAgent
 from director.agents.brandkit import BrandkitAgent
@@ -45,6 +46,7 @@ class ChatHandler:
             PricingAgent,
             UploadAgent,
             SearchAgent,
+            SurveillanceAgent,
             PromptClipAgent,
             IndexAgent,
             BrandkitAgent,
@@ -0,0 +1,77 @@
+import asyncio
+
+import fal_client
+import httpx
+
+PARAMS_CONFIG = {
+    "text_to_video": {
+        "model_name": {
+            "type": "string",
+            "description": "Model to use for video generation",
+            "enum": [
+                "fal-ai/fast-animatediff/text-to-video",
+                "fal-ai/fast-svd/text-to-video",
+                "fal-ai/ltx-video",
+            ],
+            "default": "fal-ai/fast-animatediff/text-to-video",
+        },
+        "negative_prompt": {
+            "type": "string",
+            "description": "Negative text prompt",
+        },
+    }
+}
+
+
+class FalVideoGenerationTool:
+    def __init__(self, api_key: str):
+        self.api_key = api_key
+        # Explicit client credentials instead of an os.environ["FAL_KEY"]
+        # mutation, so concurrent tools can use different keys safely.
+        self._client = fal_client.AsyncClient(key=api_key)
+
+    async def text_to_video_async(
+        self, prompt: str, save_at: str, duration: float, config: dict
+    ):
+        """
+        Generate a video from a text prompt using FAL's API.
+        :param str prompt: The text prompt to generate the video
+        :param str save_at: File path to save the generated video
+        :param float duration: Duration of the video in seconds
+        :param dict config: Additional configuration options
+        """
+        model_name = config.get(
+            "model_name", "fal-ai/fast-animatediff/text-to-video"
+        )
+        arguments = {
+            "prompt": prompt,
+            "duration": duration,
+        }
+        negative_prompt = config.get("negative_prompt")
+        if negative_prompt:
+            arguments["negative_prompt"] = negative_prompt
+
+        handler = await self._client.submit(model_name, arguments=arguments)
+        # Drain progress events without blocking the loop, the download
+        # starts as soon as the job reports the video url.
+        async for _ in handler.iter_events():
+            pass
+        res = await handler.get()
+        video_url = res["video"]["url"]
+
+        # Stream the download in 1MB chunks so peak memory stays constant
+        # instead of buffering the whole video before writing.
+        async with httpx.AsyncClient(timeout=300) as client:
+            async with client.stream("GET", video_url) as response:
+                response.raise_for_status()
+                with open(save_at, "wb") as f:
+                    async for chunk in response.aiter_bytes(1 << 20):
+                        f.write(chunk)
+
+    def text_to_video(self, prompt: str, save_at: str, duration: float, config: dict):
+        """Sync wrapper over text_to_video_async for callers without a loop."""
+        asyncio.run(
+            self.text_to_video_async(
+                prompt=prompt, save_at=save_at, duration=duration, config=config
+            )
+        )